@@ -21,6 +21,7 @@ from polytracker.bot import (
     help_command,
     list_wallets,
     post_init,
+    post_shutdown,
     remove_wallet,
     start,
 )
@@ -41,7 +42,13 @@ def main() -> None:
     if sys.platform.startswith("win"):
         asyncio.set_event_loop_policy(asyncio.WindowsSelectorEventLoopPolicy())
 
-    app = ApplicationBuilder().token(settings.token).post_init(post_init).build()
+    app = (
+        ApplicationBuilder()
+        .token(settings.token)
+        .post_init(post_init)
+        .post_shutdown(post_shutdown)
+        .build()
+    )
 
     app.add_handler(CommandHandler("start", start))
     app.add_handler(CommandHandler("help", help_command))
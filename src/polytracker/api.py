@@ -7,21 +7,101 @@ raising, so callers don't need to wrap every call in try/except.
 import asyncio
 import json
 import logging
+import time
 from typing import Any, Dict, List, Optional, Tuple
 
 import httpx
+import orjson
+from cachetools import TLRUCache, TTLCache
 
+from polytracker import __version__
 from polytracker.config import settings
 
 logger = logging.getLogger(__name__)
 
-# In-memory cache: event_id -> category string (with emoji prefix)
-category_cache: Dict[str, str] = {}
+
+def _category_expiry(_event_id: str, entry: Tuple[str, float], _now: float) -> float:
+    """Expire a cached category ``category_cache_ttl`` after it was fetched."""
+    return entry[1] + settings.category_cache_ttl
+
+
+# In-memory cache: event_id -> (category string with emoji prefix, fetched_at
+# as a Unix timestamp). Bounded in size; entries are also persisted so
+# restarts start warm, and keep their original expiry when reloaded.
+category_cache: TLRUCache = TLRUCache(
+    maxsize=settings.category_cache_size,
+    ttu=_category_expiry,
+    timer=time.time,
+)
+
+# Categories fetched but not yet written to the ``categories`` table:
+# event_id -> (label, fetched_at). ``bot`` commits them together with its
+# batched position writes, so a lookup never waits on SQLite.
+unsaved_categories: Dict[str, Tuple[str, int]] = {}
+
+# Negative cache: event IDs with no category, or whose lookup failed. Kept
+# apart from ``category_cache`` so misses expire much sooner than hits.
+_missing_categories: TTLCache = TTLCache(
+    maxsize=settings.category_cache_size,
+    ttl=settings.category_negative_ttl,
+)
+
+# Lookups currently in flight: event_id -> future resolving to the category.
+# Lets concurrent callers for the same cold event share one request.
+_inflight_categories: Dict[str, "asyncio.Future[str]"] = {}
+
+# Caps concurrent requests across all wallets. Created lazily so it binds to
+# the running event loop rather than whichever loop existed at import time.
+_request_semaphore: Optional[asyncio.Semaphore] = None
+
+
+# ── Internal helpers ──────────────────────────────────────────────────────
+
+
+def _json(response: httpx.Response) -> Any:
+    """Decode a JSON response body with ``orjson`` (much faster than ``json``).
+
+    Raises ``orjson.JSONDecodeError``, a subclass of ``json.JSONDecodeError``.
+    """
+    return orjson.loads(response.content)
+
+
+async def _get(client: httpx.AsyncClient, url: str, **kwargs: Any) -> httpx.Response:
+    """Issue a GET through *client*, waiting for a free concurrency slot first.
+
+    Don't pass ``timeout=`` here: a per-request value replaces the client's
+    whole ``httpx.Timeout``, including its shorter connect timeout.
+    """
+    global _request_semaphore
+    if _request_semaphore is None:
+        _request_semaphore = asyncio.Semaphore(settings.api_max_concurrency)
+    async with _request_semaphore:
+        return await client.get(url, **kwargs)
 
 
 # ── Public helpers ─────────────────────────────────────────────────────────
 
 
+def create_client() -> httpx.AsyncClient:
+    """Build the long-lived async client shared by every API call.
+
+    HTTP/2 and a keep-alive pool let consecutive polls reuse the same TLS
+    connections to Polymarket instead of handshaking on every tick.
+    """
+    return httpx.AsyncClient(
+        http2=True,
+        limits=httpx.Limits(
+            max_connections=settings.api_max_connections,
+            max_keepalive_connections=settings.api_max_connections,
+            keepalive_expiry=settings.api_keepalive_expiry,
+        ),
+        timeout=httpx.Timeout(settings.api_timeout, connect=settings.api_connect_timeout),
+        headers={"user-agent": f"PolyTracker/{__version__}"},
+        verify=settings.api_verify_ssl,
+        proxy=settings.proxy_url or None,
+    )
+
+
 async def fetch_positions(
     client: httpx.AsyncClient,
     wallet: str,
@@ -31,10 +111,26 @@ async def fetch_positions(
     Returns ``None`` if the entire request fails (network error, non-2xx
     response, etc.), or a list of position dicts on success.
     """
+    result = await fetch_positions_with_digest(client, wallet)
+    return None if result is None else result[0]
+
+
+async def fetch_positions_with_digest(
+    client: httpx.AsyncClient,
+    wallet: str,
+) -> Optional[Tuple[List[Dict[str, Any]], int]]:
+    """Like :func:`fetch_positions`, but also return a digest of the raw payload.
+
+    The digest is a hash over every page's response body, so two fetches
+    with byte-identical responses get the same digest.  It uses the
+    built-in (per-process seeded) ``hash``, so it is only comparable within
+    a single run.
+    """
     url = "https://data-api.polymarket.com/positions"
     all_positions: List[Dict[str, Any]] = []
     limit = settings.api_page_limit
     offset = 0
+    digest = 0
 
     try:
         while True:
@@ -45,7 +141,7 @@ async def fetch_positions(
                 "limit": limit,
                 "offset": offset,
             }
-            response = await client.get(url, params=params, timeout=settings.api_timeout)
+            response = await _get(client, url, params=params)
             response.raise_for_status()
 
             # Detect API returning HTML instead of JSON (Polymarket outage)
@@ -58,7 +154,8 @@ async def fetch_positions(
                 )
                 return None
 
-            data = response.json()
+            data = _json(response)
+            digest = hash((digest, response.content))
 
             if not data:
                 break
@@ -70,7 +167,7 @@ async def fetch_positions(
 
             offset += limit
 
-        return all_positions
+        return all_positions, digest
 
     except httpx.HTTPError as e:
         logger.error("API error fetching positions for %s: %s", wallet, e)
@@ -99,26 +196,28 @@ async def fetch_recent_activity(
 
     try:
         r1, r2 = await asyncio.gather(
-            client.get(
+            _get(
+                client,
                 trades_url,
                 params={"user": wallet, "limit": 20},
-                timeout=settings.api_timeout,
             ),
-            client.get(
+            _get(
+                client,
                 activity_url,
                 params={"user": wallet, "limit": 20},
-                timeout=settings.api_timeout,
             ),
             return_exceptions=True,
         )
 
         if isinstance(r1, httpx.Response) and r1.status_code == 200:
-            trades = r1.json()
+            trades = _json(r1)
         if isinstance(r2, httpx.Response) and r2.status_code == 200:
-            activity = r2.json()
+            activity = _json(r2)
 
     except httpx.HTTPError as e:
         logger.error("API error fetching activity for %s: %s", wallet, e)
+    except json.JSONDecodeError as e:
+        logger.error("Invalid JSON from Polymarket activity API for %s: %s", wallet, e)
     except Exception:
         logger.exception("Unexpected error fetching activity for %s", wallet)
 
@@ -131,22 +230,49 @@ async def get_event_category(
 ) -> str:
     """Fetch a human-readable category for *event_id*, with emoji prefix.
 
-    Results are cached in ``category_cache`` so repeated lookups for the
-    same event return instantly.  Returns an empty string on failure or
-    when the category can't be determined.
+    Results are cached in ``category_cache`` (and queued in
+    ``unsaved_categories`` for the ``categories`` table) so repeated
+    lookups for the same event return instantly.  Returns an empty string
+    on failure or when the category can't be determined; such
+    misses are remembered in ``_missing_categories`` for a shorter
+    ``category_negative_ttl``, so a broken event isn't re-fetched on every
+    poll but is retried before long.
+
+    Concurrent lookups for the same uncached event share a single request.
     """
     if not event_id:
         return ""
 
     cached = category_cache.get(event_id)
     if cached is not None:
-        return cached
+        return cached[0]
+    if event_id in _missing_categories:
+        return ""
+
+    pending = _inflight_categories.get(event_id)
+    if pending is not None:
+        return await asyncio.shield(pending)
 
+    future: asyncio.Future = asyncio.get_running_loop().create_future()
+    _inflight_categories[event_id] = future
+    try:
+        cat = await _fetch_event_category(client, event_id)
+        future.set_result(cat)
+        return cat
+    finally:
+        del _inflight_categories[event_id]
+        if not future.done():
+            # We were cancelled mid-fetch; let waiters fall back to no label.
+            future.set_result("")
+
+
+async def _fetch_event_category(client: httpx.AsyncClient, event_id: str) -> str:
+    """Request *event_id* from the Gamma API and cache the resulting label."""
     url = f"https://gamma-api.polymarket.com/events/{event_id}"
     try:
-        response = await client.get(url, timeout=5)
+        response = await _get(client, url)
         if response.status_code == 200:
-            data = response.json()
+            data = _json(response)
             markets = data.get("markets", [])
             if markets:
                 cat = markets[0].get("category", "")
@@ -156,72 +282,13 @@ async def get_event_category(
                         if keyword in cat:
                             cat = f"{emoji} {cat}"
                             break
-                    category_cache[event_id] = cat
+                    now = time.time()
+                    category_cache[event_id] = (cat, now)
+                    unsaved_categories[event_id] = (cat, int(now))
                     return cat
 
     except (httpx.HTTPError, ValueError, KeyError) as e:
         logger.debug("Failed to fetch category for event %s: %s", event_id, e)
 
+    _missing_categories[event_id] = True
     return ""
-
-
-def fetch_positions_blocking(address: str) -> List[Dict[str, Any]]:
-    """Fetch all positions synchronously (used during the initial ``/add`` sync).
-
-    Uses ``httpx.Client`` instead of ``requests`` to keep a single HTTP
-    library across the project.
-    """
-    url = "https://data-api.polymarket.com/positions"
-    all_positions: List[Dict[str, Any]] = []
-    limit = settings.api_page_limit
-    offset = 0
-
-    try:
-        with httpx.Client(
-            verify=settings.api_verify_ssl, proxy=settings.proxy_url or None
-        ) as client:
-            while True:
-                params = {
-                    "user": address,
-                    "sortBy": "CURRENT",
-                    "sortDirection": "DESC",
-                    "limit": limit,
-                    "offset": offset,
-                }
-                response = client.get(url, params=params, timeout=settings.api_timeout)
-                response.raise_for_status()
-
-                # Detect API returning HTML instead of JSON (Polymarket outage)
-                content_type = response.headers.get("content-type", "")
-                if "json" not in content_type:
-                    logger.error(
-                        "Polymarket API returned %s (expected JSON) for %s. "
-                        "The API may be temporarily unavailable.",
-                        content_type or "empty response",
-                        address,
-                    )
-                    return []
-
-                data = response.json()
-
-                if not data:
-                    break
-
-                all_positions.extend(data)
-
-                if len(data) < limit:
-                    break
-
-                offset += limit
-
-        return all_positions
-
-    except httpx.HTTPError as e:
-        logger.error("HTTP error syncing positions for %s: %s", address, e)
-        return []
-    except json.JSONDecodeError as e:
-        logger.error("Invalid JSON from Polymarket API for %s: %s", address, e)
-        return []
-    except Exception:
-        logger.exception("Unexpected error syncing positions for %s", address)
-        return []
@@ -2,7 +2,11 @@
 
 import asyncio
 import logging
-from typing import Any, Dict
+import random
+import sqlite3
+import time
+from functools import lru_cache
+from typing import Any, Dict, List, Optional, Set, Tuple
 
 import httpx
 from telegram import BotCommand, InlineKeyboardButton, InlineKeyboardMarkup, Update
@@ -14,11 +18,69 @@ from polytracker.config import settings
 
 logger = logging.getLogger(__name__)
 
-# Debounce tracker: maps "address_assetId" -> consecutive poll absences.
-# When the count reaches ``close_debounce_count`` the position is declared
-# closed and we send an alert.
-_pending_deletes: Dict[str, int] = {}
-
+# In-memory mirror of the ``wallets`` table: address -> display name. Loaded
+# once in ``post_init`` and kept in sync by ``/add`` and ``/remove``, so the
+# polling loop never has to query it.
+_wallets: Dict[str, str] = {}
+
+# In-memory mirror of the ``positions`` table: address -> {asset_id: data}.
+# Loaded once in ``post_init``; afterwards it is the source of truth for
+# change detection and SQLite only serves as the durable copy.
+_positions: Dict[str, Dict[str, Dict[str, Any]]] = {}
+
+# Per-wallet backoff for failing or idle wallets: address -> (interval,
+# next_poll_at), with ``next_poll_at`` on the ``time.monotonic()`` clock.
+# Wallets polling at the normal rate have no entry and are checked every tick.
+_poll_backoff: Dict[str, Tuple[float, float]] = {}
+
+# Digest of each wallet's last fully processed ``/positions`` payload. An
+# identical payload on the next poll means there is nothing to diff.
+_positions_digest: Dict[str, int] = {}
+
+# Position writes not yet committed to SQLite: (address, asset_id) -> data,
+# or ``None`` for a delete. Only the latest write per position is kept, and
+# an entry is dropped only once a commit containing it succeeds, so a failed
+# flush (e.g. the database is locked) is retried on the next tick.
+_unsaved_positions: Dict[Tuple[str, str], Optional[Dict[str, Any]]] = {}
+
+# Alert message templates, filled with ``str.format_map``.  ``pnl_msg`` is
+# either empty or a preformatted "\n💵 ..." line.
+NEW_BET_TMPL = (
+    "✅ **NEW BET: {name_linked}**\n\n"
+    "Event: {display_title}\n"
+    "Pick: **{outcome}**\n"
+    "💰 **Value: ${total_value:,.2f}**\n"
+    "Size: {size:,.2f} Shares\n"
+    "Avg Price: {avg_price:.2f}¢"
+)
+INCREASED_TMPL = (
+    "📈 **INCREASED: {name_linked}**\n\n"
+    "Event: {display_title}\n"
+    "Pick: **{outcome}**\n"
+    "💰 **Added: ${added_value:,.2f}**\n"
+    "💰 **Position Total: ${total_value:,.2f}**\n"
+    "Shares: +{diff:,.2f}\n"
+    "Trade Price: ~{trade_price:.2f}¢\n"
+    "(Avg: {old_avg_price:.2f}¢ ➜ {avg_price:.2f}¢)"
+)
+SOLD_TMPL = (
+    "📉 **SOLD: {name_linked}**\n\n"
+    "Event: {display_title}\n"
+    "Pick: **{outcome}**\n"
+    "💰 **Sold Value: ${sold_value:,.2f}**\n"
+    "💰 **Position Total: ${total_value:,.2f}**"
+    "{pnl_msg}\n"
+    "Shares: -{diff:,.2f}\n"
+    "Sell Price: {trade_price:.2f}¢"
+)
+CLOSED_TMPL = (
+    "🚪 **POSITION CLOSED: {name_linked}**\n\n"
+    "Event: {title}\n"
+    "Pick: **{outcome}**"
+    "{pnl_msg}\n"
+    "Action: {exit_type}\n"
+    "Exit Price: ${trade_price:.2f}"
+)
 
 # ═══════════════════════════════════════════════════════════════════════════
 # Command handlers
@@ -58,28 +120,37 @@ async def add_wallet(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None
 
     msg = await update.message.reply_text(f"⏳ Syncing **{name}**...")
 
-    # Run the blocking HTTP sync in a thread executor so the async loop
-    # isn't blocked.
-    all_positions = await asyncio.get_running_loop().run_in_executor(
-        None,
-        api_client.fetch_positions_blocking,
-        address,
-    )
-
-    db.add_wallet(address, name)
+    client: httpx.AsyncClient = context.bot_data["http"]
+    all_positions = await api_client.fetch_positions(client, address)
+    if all_positions is None:
+        if msg is not None:
+            await msg.edit_text(f"❌ Couldn't sync **{name}** — Polymarket API unavailable.")
+        return
 
+    synced: Dict[str, Dict[str, Any]] = {}
     for pos in all_positions:
-        asset = pos.get("asset", pos.get("conditionId"))
+        asset = pos.get("asset") or pos.get("conditionId")
         if asset:
-            data = {
+            synced[asset] = {
                 "size": float(pos["size"]),
                 "avgPrice": float(pos.get("avgPrice", 0)),
                 "title": pos.get("title", "Unknown"),
                 "outcome": pos.get("outcome", "Unknown"),
                 "slug": pos.get("slug", ""),
                 "conditionId": pos.get("conditionId", ""),
+                "pendingDeletes": 0,
             }
-            db.upsert_position(address, asset, data)
+
+    # Fill the in-memory mirror before the wallet becomes visible to
+    # check_wallets, so a tick can't see it with no positions and report
+    # every existing bet as new.
+    _positions.setdefault(address, {}).update(synced)
+    _positions_digest.pop(address, None)
+    await asyncio.to_thread(db.add_wallet, address, name)
+    _wallets[address] = name
+    # One executemany transaction for the whole sync, off the event loop.
+    _queue_writes([(address, asset, data) for asset, data in synced.items()], [])
+    await _flush_writes()
 
     if msg is not None:
         await msg.edit_text(f"✅ Added **{name}** ({len(all_positions)} bets synced).")
@@ -92,16 +163,17 @@ async def remove_wallet(update: Update, context: ContextTypes.DEFAULT_TYPE) -> N
 
     args = context.args or []
     query = " ".join(args).lower()
-    wallets = db.get_tracked_wallets()
-
-    for addr, name in wallets.items():
+    for addr, name in list(_wallets.items()):
         if query in name.lower() or query == addr.lower():
-            db.remove_wallet(addr)
-
-            # Purge any pending-delete entries for this address
-            keys_to_clear = [k for k in _pending_deletes if k.startswith(addr)]
-            for k in keys_to_clear:
-                del _pending_deletes[k]
+            # Forget the wallet in memory first, so a tick finishing while
+            # the delete commits already treats it as removed.
+            del _wallets[addr]
+            _positions.pop(addr, None)
+            _poll_backoff.pop(addr, None)
+            _positions_digest.pop(addr, None)
+            for key in [key for key in _unsaved_positions if key[0] == addr]:
+                del _unsaved_positions[key]
+            await asyncio.to_thread(db.remove_wallet, addr)
 
             if update.message is not None:
                 await update.message.reply_text(f"🗑️ Removed **{name}**.")
@@ -115,10 +187,10 @@ async def list_wallets(update: Update, context: ContextTypes.DEFAULT_TYPE) -> No
     """Handle ``/list`` — show every tracked wallet."""
     if update.message is None:
         return
-    wallets = db.get_tracked_wallets()
-    msg = "📋 **Tracked Wallets:**\n"
-    for addr, name in wallets.items():
-        msg += f"• [{name}](https://polymarket.com/profile/{addr})\n"
+    lines = [
+        f"• [{name}](https://polymarket.com/profile/{addr})" for addr, name in _wallets.items()
+    ]
+    msg = "📋 **Tracked Wallets:**\n" + "\n".join(lines)
     await update.message.reply_text(
         msg,
         parse_mode="Markdown",
@@ -127,7 +199,12 @@ async def list_wallets(update: Update, context: ContextTypes.DEFAULT_TYPE) -> No
 
 
 async def post_init(application: Application) -> None:
-    """Register the bot command menu after startup."""
+    """Open the shared HTTP client, warm caches, and register the command menu."""
+    application.bot_data["http"] = api_client.create_client()
+    db.prune_categories(settings.category_cache_ttl)
+    api_client.category_cache.update(db.get_categories(settings.category_cache_ttl))
+    _wallets.update(db.get_tracked_wallets())
+    _positions.update(db.get_all_positions())
     await application.bot.set_my_commands(
         [
             BotCommand("start", "Start"),
@@ -138,6 +215,14 @@ async def post_init(application: Application) -> None:
     )
 
 
+async def post_shutdown(application: Application) -> None:
+    """Close the shared HTTP client and the database connection."""
+    client = application.bot_data.pop("http", None)
+    if client is not None:
+        await client.aclose()
+    db.close_db()
+
+
 # ═══════════════════════════════════════════════════════════════════════════
 # Wallet monitoring (polling loop)
 # ═══════════════════════════════════════════════════════════════════════════
@@ -145,14 +230,161 @@ async def post_init(application: Application) -> None:
 
 async def check_wallets(context: ContextTypes.DEFAULT_TYPE) -> None:
     """Poll all tracked wallets and fire alerts for any changes."""
-    wallets = db.get_tracked_wallets()
-    async with httpx.AsyncClient(
-        verify=settings.api_verify_ssl, proxy=settings.proxy_url or None
-    ) as client:
-        tasks = [
-            _process_wallet(client, context, address, name) for address, name in wallets.items()
-        ]
-        await asyncio.gather(*tasks)
+    now = time.monotonic()
+    wallets = {
+        address: name
+        for address, name in _wallets.items()
+        if _poll_backoff.get(address, (0.0, 0.0))[1] <= now
+    }
+    client: httpx.AsyncClient = context.bot_data["http"]
+
+    # Position writes from every wallet are collected here and committed in
+    # one transaction once the whole tick has been processed (see
+    # ``_flush_writes``).
+    upserts: List[Tuple[str, str, Dict[str, Any]]] = []
+    deletes: List[Tuple[str, str]] = []
+
+    # Caps how many wallets are mid-poll at once, on top of the per-request
+    # limit in the API client, so large watchlists don't open a burst of
+    # sockets every tick.
+    semaphore = asyncio.Semaphore(settings.max_concurrent_wallets)
+    known = {address: _positions.setdefault(address, {}) for address in wallets}
+    tasks = [
+        _poll_wallet(
+            semaphore,
+            client,
+            context,
+            address,
+            name,
+            known[address],
+            upserts,
+            deletes,
+        )
+        for address, name in wallets.items()
+    ]
+    stale: Set[str] = set()
+    try:
+        results = await asyncio.gather(*tasks, return_exceptions=True)
+    finally:
+        # A wallet removed by /remove (and possibly re-added) while its poll
+        # was in flight no longer owns the dict that poll updated; drop
+        # everything that poll produced instead of resurrecting the wallet.
+        stale = {
+            address for address, mirror in known.items() if _positions.get(address) is not mirror
+        }
+        if stale:
+            upserts = [row for row in upserts if row[0] not in stale]
+            deletes = [row for row in deletes if row[0] not in stale]
+            for address in stale:
+                _positions_digest.pop(address, None)
+        _queue_writes(upserts, deletes)
+        await _flush_writes()
+
+    for address, result in zip(wallets, results):
+        if address in stale:
+            continue
+        if isinstance(result, Exception):
+            logger.error("Error processing wallet %s", address, exc_info=result)
+        elif not isinstance(result, BaseException):
+            _record_poll(address, result, now)
+
+
+def _queue_writes(
+    upserts: List[Tuple[str, str, Dict[str, Any]]],
+    deletes: List[Tuple[str, str]],
+) -> None:
+    """Add position changes to ``_unsaved_positions``, replacing older writes."""
+    for address, asset_id, data in upserts:
+        _unsaved_positions[(address, asset_id)] = data
+    for key in deletes:
+        _unsaved_positions[key] = None
+
+
+async def _flush_writes() -> None:
+    """Commit every queued position write and new category, off the event loop.
+
+    Runs in a worker thread so a slow fsync doesn't stall the loop. If the
+    commit fails, the error is logged and everything stays queued for the
+    next flush.
+    """
+    unsaved_categories = api_client.unsaved_categories
+    if not _unsaved_positions and not unsaved_categories:
+        return
+    batch = dict(_unsaved_positions)
+    categories = dict(unsaved_categories)
+    upserts = [
+        (address, asset_id, data) for (address, asset_id), data in batch.items() if data is not None
+    ]
+    deletes = [key for key, data in batch.items() if data is None]
+    category_rows = [(event_id, label, at) for event_id, (label, at) in categories.items()]
+    try:
+        await asyncio.to_thread(_save_batch, upserts, deletes, category_rows)
+    except sqlite3.Error as e:
+        logger.error("Failed to save %d position changes, will retry: %s", len(batch), e)
+        return
+    # Keep anything queued again while the commit was running.
+    for key, data in batch.items():
+        if key in _unsaved_positions and _unsaved_positions[key] is data:
+            del _unsaved_positions[key]
+    for event_id, entry in categories.items():
+        if unsaved_categories.get(event_id) is entry:
+            del unsaved_categories[event_id]
+
+
+def _save_batch(
+    upserts: List[Tuple[str, str, Dict[str, Any]]],
+    deletes: List[Tuple[str, str]],
+    categories: List[Tuple[str, str, int]],
+) -> None:
+    """Write one flush's positions and categories (called in a worker thread)."""
+    db.save_positions(upserts, deletes)
+    db.save_categories(categories)
+
+
+async def _poll_wallet(semaphore: asyncio.Semaphore, *args: Any) -> Optional[bool]:
+    """Run ``_process_wallet(*args)`` after a random delay, holding a *semaphore* slot.
+
+    The jitter is applied before the slot is taken, so waiting doesn't
+    block other wallets.
+    """
+    await asyncio.sleep(random.uniform(0, settings.poll_jitter))
+    async with semaphore:
+        return await _process_wallet(*args)
+
+
+def _record_poll(address: str, changed: Optional[bool], now: float) -> None:
+    """Update *address*'s poll interval after a poll that started at *now*.
+
+    *changed* is ``_process_wallet``'s result: ``None`` when the fetch failed,
+    otherwise whether anything changed.
+
+    - Failures stretch the interval by ``poll_backoff_factor`` up to
+      ``max_poll_interval``.
+    - Quiet polls stretch it the same way, but only up to
+      ``max_idle_poll_interval`` (``check_interval`` when unset). A wallet
+      still backing off from failures is halved toward that ceiling instead.
+    - Any change snaps the wallet back to the normal ``check_interval``.
+    """
+    if changed:
+        _poll_backoff.pop(address, None)
+        return
+
+    idle_ceiling = settings.max_idle_poll_interval
+    if idle_ceiling is None:
+        idle_ceiling = settings.check_interval
+
+    interval = _poll_backoff.get(address, (float(settings.check_interval), 0.0))[0]
+    if changed is None:
+        interval = min(interval * settings.poll_backoff_factor, settings.max_poll_interval)
+    elif interval > idle_ceiling:
+        interval = max(interval / 2, idle_ceiling)
+    else:
+        interval = min(interval * settings.poll_backoff_factor, idle_ceiling)
+
+    if interval <= settings.check_interval:
+        _poll_backoff.pop(address, None)
+    else:
+        _poll_backoff[address] = (interval, now + interval)
 
 
 async def _process_wallet(
@@ -160,83 +392,145 @@ async def _process_wallet(
     context: ContextTypes.DEFAULT_TYPE,
     address: str,
     name: str,
-) -> None:
-    """Compare live API positions against stored data and alert on differences."""
-    known_positions = db.get_wallet_positions(address)
-    current_positions = await api_client.fetch_positions(client, address)
+    known_positions: Dict[str, Dict[str, Any]],
+    upserts: List[Tuple[str, str, Dict[str, Any]]],
+    deletes: List[Tuple[str, str]],
+) -> Optional[bool]:
+    """Compare live API positions against *known_positions* and alert on differences.
+
+    *known_positions* is updated in place. Changes are also appended to
+    *upserts* / *deletes* so ``check_wallets`` can persist them once per tick.
+    Returns ``None`` if the positions could not be fetched, otherwise whether
+    anything changed (including a position still being debounced as closed).
+    """
+    result = await api_client.fetch_positions_with_digest(client, address)
 
-    if current_positions is None:
-        return  # API error already logged — nothing we can do this cycle.
+    if result is None:
+        return None  # API error already logged — nothing we can do this cycle.
 
-    clean_name = name.replace("_", " ")
-    user_link = f"https://polymarket.com/profile/{address}"
-    name_linked = f"[{clean_name}]({user_link})"
+    current_positions, digest = result
+    # A byte-identical payload can only matter if a close is still being
+    # debounced, since each further absence has to be counted.
+    if _positions_digest.get(address) == digest and not any(
+        data.get("pendingDeletes") for data in known_positions.values()
+    ):
+        return False
 
     current_asset_ids: set = set()
+    changed = False
+
+    # Positions that warrant an alert: (case, asset_id, new_data, old_data, event_id)
+    alerts: List[Tuple[str, str, Dict[str, Any], Dict[str, Any], Optional[str]]] = []
 
-    # ── 1. Process every position the API returned ─────────────────────
+    # ── 1. Diff every position the API returned ────────────────────────
     for pos in current_positions:
-        asset_id = pos.get("asset", pos.get("conditionId"))
+        asset_id = pos.get("asset") or pos.get("conditionId")
         if not asset_id:
             continue
 
         current_asset_ids.add(asset_id)
 
-        # Cancel any pending-delete for this position — it's still alive.
-        _pending_deletes.pop(f"{address}_{asset_id}", None)
+        new_data_block = {
+            "size": float(pos["size"]),
+            "avgPrice": float(pos.get("avgPrice", 0)),
+            "title": pos.get("title", "Unknown Event"),
+            "outcome": pos.get("outcome", pos.get("outcomeLabel", "Unknown")),
+            "slug": pos.get("slug", ""),
+            "conditionId": pos.get("conditionId"),
+            # Seen again, so any close debounce in progress starts over.
+            "pendingDeletes": 0,
+        }
+        new_size = new_data_block["size"]
+        old_data = known_positions.get(asset_id)
 
-        new_size = float(pos["size"])
-        title = pos.get("title", "Unknown Event")
-        outcome = pos.get("outcome", pos.get("outcomeLabel", "Unknown"))
-        slug = pos.get("slug", "")
-        new_avg_price = float(pos.get("avgPrice", 0))
-        event_id = pos.get("eventId")
-        condition_id = pos.get("conditionId")
-        current_total_value = new_size * new_avg_price
+        if old_data is None:
+            case = "new"
+        elif new_size > old_data["size"] + settings.min_size_change:
+            case = "increased"
+        elif new_size < old_data["size"] - settings.min_size_change:
+            case = "decreased"
+        else:
+            # Case D: negligible change — persist silently if anything moved.
+            if new_data_block != old_data:
+                known_positions[asset_id] = new_data_block
+                upserts.append((address, asset_id, new_data_block))
+                changed = True
+            continue
 
-        # Category label (with emoji)
-        category = await api_client.get_event_category(client, event_id)
-        display_title = f"**{category}** | {title}" if category else title
+        alerts.append((case, asset_id, new_data_block, old_data or {}, pos.get("eventId")))
 
-        # Old data (if any)
-        old_data = known_positions.get(asset_id)
-        old_size = old_data["size"] if old_data else 0.0
-        old_avg_price = old_data["avgPrice"] if old_data else 0.0
+    # ── 2. Detect closed positions (with debounce) ──────────────────
+    closed: List[Tuple[str, Dict[str, Any]]] = []
+    for asset_id, old_data in known_positions.items():
+        if asset_id in current_asset_ids:
+            continue
 
-        new_data_block = {
-            "size": new_size,
-            "avgPrice": new_avg_price,
-            "title": title,
+        # Count consecutive absences on the position itself (and persist the
+        # count) so the debounce survives restarts.
+        changed = True
+        absences = old_data.get("pendingDeletes", 0) + 1
+        if absences >= settings.close_debounce_count:
+            closed.append((asset_id, old_data))
+        else:
+            pending = {**old_data, "pendingDeletes": absences}
+            known_positions[asset_id] = pending
+            upserts.append((address, asset_id, pending))
+
+    if not alerts and not closed:
+        _positions_digest[address] = digest
+        return changed
+
+    # ── 3. Fetch what the alerts need, concurrently ─────────────────
+    # Sells and closes look up the exit price in the wallet's recent trades
+    # and activity; fetch those once for the whole wallet, and only if needed.
+    trades: List[Dict[str, Any]] = []
+    activity: List[Dict[str, Any]] = []
+    needs_activity = bool(closed) or any(case == "decreased" for case, *_ in alerts)
+
+    event_ids = list({event_id for *_, event_id in alerts if event_id})
+    category_lookups = asyncio.gather(
+        *(api_client.get_event_category(client, event_id) for event_id in event_ids)
+    )
+    if needs_activity:
+        labels, (trades, activity) = await asyncio.gather(
+            category_lookups,
+            api_client.fetch_recent_activity(client, address),
+        )
+    else:
+        labels = await category_lookups
+    categories = dict(zip(event_ids, labels))
+
+    clean_name = name.replace("_", " ")
+    user_link = f"https://polymarket.com/profile/{address}"
+    name_linked = f"[{clean_name}]({user_link})"
+
+    # ── 4. Send alerts, recording each change once it has gone out ──
+    for case, asset_id, new_data, old_data, event_id in alerts:
+        new_size = new_data["size"]
+        new_avg_price = new_data["avgPrice"]
+        title = new_data["title"]
+        outcome = new_data["outcome"]
+        old_size = old_data.get("size", 0.0)
+        old_avg_price = old_data.get("avgPrice", 0.0)
+        current_total_value = new_size * new_avg_price
+
+        category = categories.get(event_id, "") if event_id else ""
+        ctx: Dict[str, Any] = {
+            "name_linked": name_linked,
+            "display_title": f"**{category}** | {title}" if category else title,
             "outcome": outcome,
-            "slug": slug,
-            "conditionId": condition_id,
+            "total_value": current_total_value,
+            "size": new_size,
+            "avg_price": new_avg_price,
+            "old_avg_price": old_avg_price,
         }
 
-        market_link = f"https://polymarket.com/event/{slug}" if slug else "https://polymarket.com"
-        keyboard = [[InlineKeyboardButton("🚀 View Market", url=market_link)]]
-        reply_markup = InlineKeyboardMarkup(keyboard)
-
         # ── Case A: Brand-new position ──────────────────────────────
-        if asset_id not in known_positions:
-            msg = (
-                f"✅ **NEW BET: {name_linked}**\n\n"
-                f"Event: {display_title}\n"
-                f"Pick: **{outcome}**\n"
-                f"💰 **Value: ${current_total_value:,.2f}**\n"
-                f"Size: {new_size:,.2f} Shares\n"
-                f"Avg Price: {new_avg_price:.2f}¢"
-            )
-            await context.bot.send_message(
-                chat_id=settings.allowed_user_id,
-                text=msg,
-                parse_mode="Markdown",
-                reply_markup=reply_markup,
-                disable_web_page_preview=True,
-            )
-            db.upsert_position(address, asset_id, new_data_block)
+        if case == "new":
+            msg = NEW_BET_TMPL.format_map(ctx)
 
         # ── Case B: Increased position ──────────────────────────────
-        elif new_size > old_size + settings.min_size_change:
+        elif case == "increased":
             diff = new_size - old_size
             cost_now = new_size * new_avg_price
             cost_before = old_size * old_avg_price
@@ -248,30 +542,13 @@ async def _process_wallet(
                 if price >= 0:
                     estimated_trade_price = price
 
-            msg = (
-                f"📈 **INCREASED: {name_linked}**\n\n"
-                f"Event: {display_title}\n"
-                f"Pick: **{outcome}**\n"
-                f"💰 **Added: ${added_value:,.2f}**\n"
-                f"💰 **Position Total: ${current_total_value:,.2f}**\n"
-                f"Shares: +{diff:,.2f}\n"
-                f"Trade Price: ~{estimated_trade_price:.2f}¢\n"
-                f"(Avg: {old_avg_price:.2f}¢ ➜ {new_avg_price:.2f}¢)"
-            )
-            await context.bot.send_message(
-                chat_id=settings.allowed_user_id,
-                text=msg,
-                parse_mode="Markdown",
-                reply_markup=reply_markup,
-                disable_web_page_preview=True,
-            )
-            db.upsert_position(address, asset_id, new_data_block)
+            ctx.update(added_value=added_value, diff=diff, trade_price=estimated_trade_price)
+            msg = INCREASED_TMPL.format_map(ctx)
 
         # ── Case C: Decreased (partial sell) ────────────────────────
-        elif new_size < old_size - settings.min_size_change:
+        else:
             diff = old_size - new_size
 
-            trades, _ = await api_client.fetch_recent_activity(client, address)
             trade_price = new_avg_price
             found_trade = False
             for t in trades or ():
@@ -289,69 +566,75 @@ async def _process_wallet(
                 symbol = "+" if pnl >= 0 else "-"
                 pnl_msg = f"\n💵 **Realized PnL: {symbol}${abs(pnl):,.2f} ({pnl_percent:+.2f}%)**"
 
-            msg = (
-                f"📉 **SOLD: {name_linked}**\n\n"
-                f"Event: {display_title}\n"
-                f"Pick: **{outcome}**\n"
-                f"💰 **Sold Value: ${sold_value:,.2f}**\n"
-                f"💰 **Position Total: ${current_total_value:,.2f}**"
-                f"{pnl_msg}\n"
-                f"Shares: -{diff:,.2f}\n"
-                f"Sell Price: {trade_price:.2f}¢"
-            )
-            await context.bot.send_message(
-                chat_id=settings.allowed_user_id,
-                text=msg,
-                parse_mode="Markdown",
-                reply_markup=reply_markup,
-                disable_web_page_preview=True,
-            )
-            db.upsert_position(address, asset_id, new_data_block)
-
-        # ── Case D: Negligible change — just persist silently ───────
-        else:
-            db.upsert_position(address, asset_id, new_data_block)
+            ctx.update(sold_value=sold_value, pnl_msg=pnl_msg, diff=diff, trade_price=trade_price)
+            msg = SOLD_TMPL.format_map(ctx)
 
-    # ── 2. Detect closed positions (with debounce) ──────────────────
-    for asset_id, old_data in known_positions.items():
-        if asset_id in current_asset_ids:
-            continue
+        await context.bot.send_message(
+            chat_id=settings.allowed_user_id,
+            text=msg,
+            parse_mode="Markdown",
+            reply_markup=_market_markup(new_data["slug"], "🚀 View Market"),
+            disable_web_page_preview=True,
+        )
+        known_positions[asset_id] = new_data
+        upserts.append((address, asset_id, new_data))
+
+    for asset_id, old_data in closed:
+        await _handle_closed_position(
+            context,
+            address,
+            name,
+            asset_id,
+            old_data,
+            trades,
+            activity,
+        )
+        del known_positions[asset_id]
+        deletes.append((address, asset_id))
 
-        delete_key = f"{address}_{asset_id}"
-        _pending_deletes[delete_key] = _pending_deletes.get(delete_key, 0) + 1
+    _positions_digest[address] = digest
+    return True
 
-        if _pending_deletes[delete_key] >= settings.close_debounce_count:
-            await _handle_closed_position(
-                client,
-                context,
-                address,
-                name,
-                asset_id,
-                old_data,
-            )
-            del _pending_deletes[delete_key]
+
+def _market_markup(slug: str, label: str) -> InlineKeyboardMarkup:
+    """Build the single-button keyboard linking an alert to its market page.
+
+    Only built when an alert is actually sent, not for every polled position.
+    """
+    if not slug:
+        return _default_markup(label)
+    market_link = f"https://polymarket.com/event/{slug}"
+    return InlineKeyboardMarkup([[InlineKeyboardButton(label, url=market_link)]])
+
+
+@lru_cache(maxsize=None)
+def _default_markup(label: str) -> InlineKeyboardMarkup:
+    """Return the shared fallback keyboard (Polymarket home) for alerts without a slug."""
+    return InlineKeyboardMarkup([[InlineKeyboardButton(label, url="https://polymarket.com")]])
 
 
 async def _handle_closed_position(
-    client: httpx.AsyncClient,
     context: ContextTypes.DEFAULT_TYPE,
     address: str,
     name: str,
     asset_id: str,
     old_data: Dict[str, Any],
+    trades: List[Dict[str, Any]],
+    activity: List[Dict[str, Any]],
 ) -> None:
-    """Send a "position closed" alert and remove the record from the DB.
+    """Send a "position closed" alert.
 
     Called after the position has been absent from the API for
-    ``close_debounce_count`` consecutive polls.
+    ``close_debounce_count`` consecutive polls.  *trades* and *activity*
+    are the wallet's recent history (fetched once per poll by the caller),
+    used to tell sells from redemptions.  The caller is responsible for
+    deleting the stored record.
     """
     title = old_data.get("title", "Unknown Event")
     outcome = old_data.get("outcome", "Unknown")
     slug = old_data.get("slug", "")
     condition_id = old_data.get("conditionId", "")
 
-    trades, activity = await api_client.fetch_recent_activity(client, address)
-
     trade_price = 0.0
     exit_type = "Expired / Lost"
     found_exit = False
@@ -396,27 +679,24 @@ async def _handle_closed_position(
         symbol = "+" if pnl >= 0 else "-"
         pnl_msg = f"\n💵 **Closed PnL: {symbol}${abs(pnl):,.2f} ({pnl_percent:+.2f}%)**"
 
-    market_link = f"https://polymarket.com/event/{slug}" if slug else "https://polymarket.com"
-    keyboard = [[InlineKeyboardButton("👀 View Market", url=market_link)]]
-    reply_markup = InlineKeyboardMarkup(keyboard)
-
     clean_name = name.replace("_", " ")
     user_link = f"https://polymarket.com/profile/{address}"
     name_linked = f"[{clean_name}]({user_link})"
 
-    msg = (
-        f"🚪 **POSITION CLOSED: {name_linked}**\n\n"
-        f"Event: {title}\n"
-        f"Pick: **{outcome}**"
-        f"{pnl_msg}\n"
-        f"Action: {exit_type}\n"
-        f"Exit Price: ${trade_price:.2f}"
+    msg = CLOSED_TMPL.format_map(
+        {
+            "name_linked": name_linked,
+            "title": title,
+            "outcome": outcome,
+            "pnl_msg": pnl_msg,
+            "exit_type": exit_type,
+            "trade_price": trade_price,
+        }
     )
     await context.bot.send_message(
         chat_id=settings.allowed_user_id,
         text=msg,
         parse_mode="Markdown",
-        reply_markup=reply_markup,
+        reply_markup=_market_markup(slug, "👀 View Market"),
         disable_web_page_preview=True,
     )
-    db.delete_position(address, asset_id)
@@ -7,7 +7,7 @@ defaults for everything else.
 import os
 import sys
 from dataclasses import dataclass, field
-from typing import Dict
+from typing import Dict, Optional
 
 from dotenv import load_dotenv
 
@@ -33,6 +33,32 @@ class Settings:
     check_interval: int = 3
     """Seconds between each poll of all tracked wallets."""
 
+    poll_jitter: float = 1.0
+    """Upper bound (seconds) of the random delay before each wallet's poll.
+
+    Spreads requests across the tick so wallets don't hit the API in
+    lockstep. Keep it well below ``check_interval``.
+    """
+
+    poll_backoff_factor: float = 1.5
+    """Multiplier applied to a wallet's poll interval after a failed fetch."""
+
+    max_poll_interval: int = 60
+    """Ceiling (seconds) for a wallet's backed-off poll interval."""
+
+    max_concurrent_wallets: int = 32
+    """Maximum number of wallets being polled at the same time."""
+
+    max_idle_poll_interval: Optional[int] = None
+    """Ceiling (seconds) a quiet wallet's poll interval may stretch to.
+
+    ``None`` (the default) means the same as ``check_interval``, so idle
+    wallets are polled at the full rate. Setting it higher makes each quiet
+    poll stretch the interval by ``poll_backoff_factor`` (any change snaps
+    it back), trading request volume for alert latency: the first trade
+    after a quiet spell can be noticed up to this many seconds late.
+    """
+
     close_debounce_count: int = 3
     """How many consecutive polls a position must be absent before we call it closed."""
 
@@ -46,6 +72,30 @@ class Settings:
     api_timeout: int = 10
     """HTTP request timeout in seconds."""
 
+    api_connect_timeout: int = 5
+    """Timeout in seconds for establishing a new connection."""
+
+    api_max_connections: int = 50
+    """Size of the shared HTTP connection pool (also its keep-alive limit)."""
+
+    api_keepalive_expiry: int = 60
+    """Seconds an idle pooled connection is kept open.
+
+    Must exceed ``check_interval`` so connections survive between polls.
+    """
+
+    api_max_concurrency: int = 5
+    """Maximum number of Polymarket requests in flight at once (avoids HTTP 429s)."""
+
+    category_cache_size: int = 5000
+    """Maximum number of event categories kept in memory."""
+
+    category_cache_ttl: int = 6 * 3600
+    """Seconds an event category stays cached (in memory and in the database)."""
+
+    category_negative_ttl: int = 300
+    """Seconds to remember that an event has no category (or its lookup failed)."""
+
     api_verify_ssl: bool = False
     """Whether to verify SSL certificates when calling Polymarket APIs.
 
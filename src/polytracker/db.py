@@ -1,21 +1,68 @@
 """SQLite database layer for PolyTracker.
 
-Uses context managers for all connections so resources are never leaked.
+A single long-lived connection is shared by every helper. It runs in WAL
+mode with ``synchronous=NORMAL`` so commits append to the write-ahead log
+instead of forcing a full fsync of the database file each time.
 """
 
 import sqlite3
-from typing import Any, Dict
+import threading
+import time
+from collections import defaultdict
+from contextlib import contextmanager
+from typing import Any, Dict, Iterable, Iterator, Optional, Tuple
 
 from polytracker.config import settings
 
 # ── Internal helpers ──────────────────────────────────────────────────────
 
+_conn: Optional[sqlite3.Connection] = None
+
+# Serializes write transactions on the shared connection.
+_write_lock = threading.Lock()
+
 
 def _get_conn() -> sqlite3.Connection:
-    """Create and return a new database connection with row-factory set."""
-    conn = sqlite3.connect(settings.db_file)
-    conn.row_factory = sqlite3.Row
-    return conn
+    """Return the shared connection, opening and tuning it on first use."""
+    global _conn
+    if _conn is None:
+        conn = sqlite3.connect(
+            settings.db_file,
+            check_same_thread=False,
+            isolation_level=None,
+        )
+        conn.row_factory = sqlite3.Row
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.execute("PRAGMA temp_store=MEMORY")
+        conn.execute("PRAGMA cache_size=-64000")  # ~64 MB page cache
+        _conn = conn
+    return _conn
+
+
+@contextmanager
+def _transaction() -> Iterator[sqlite3.Connection]:
+    """Run the enclosed statements in one transaction, rolling back on error."""
+    conn = _get_conn()
+    with _write_lock:
+        # IMMEDIATE takes the write lock up front, so contention with another
+        # process (e.g. the import script) waits out the busy timeout here
+        # instead of surfacing as SQLITE_BUSY halfway through the batch.
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            yield conn
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        conn.execute("COMMIT")
+
+
+def close_db() -> None:
+    """Close the shared connection (it is reopened lazily on next use)."""
+    global _conn
+    if _conn is not None:
+        _conn.close()
+        _conn = None
 
 
 # ── Schema ─────────────────────────────────────────────────────────────────
@@ -26,7 +73,7 @@ def init_db() -> None:
 
     Safe to call multiple times — idempotent by design.
     """
-    with _get_conn() as conn:
+    with _transaction() as conn:
         c = conn.cursor()
         c.execute("""CREATE TABLE IF NOT EXISTS wallets
                      (address TEXT PRIMARY KEY, name TEXT)""")
@@ -34,6 +81,8 @@ def init_db() -> None:
                      (asset_id TEXT, address TEXT, size REAL, avg_price REAL,
                       title TEXT, outcome TEXT, slug TEXT,
                       PRIMARY KEY (asset_id, address))""")
+        c.execute("""CREATE TABLE IF NOT EXISTS categories
+                     (event_id TEXT PRIMARY KEY, label TEXT, fetched_at INTEGER)""")
 
         # Migration: add condition_id column for older databases.
         try:
@@ -41,23 +90,33 @@ def init_db() -> None:
         except sqlite3.OperationalError:
             pass  # column already exists — safe to ignore
 
+        # Migration: consecutive polls a position has been missing from the
+        # API, so the close debounce survives restarts.
+        try:
+            c.execute(
+                "ALTER TABLE positions ADD COLUMN pending_delete_count INTEGER NOT NULL DEFAULT 0"
+            )
+        except sqlite3.OperationalError:
+            pass  # column already exists — safe to ignore
+
+        # The primary key leads with asset_id, so it can't serve lookups by
+        # wallet; this index covers ``WHERE address = ?``.
+        c.execute("CREATE INDEX IF NOT EXISTS idx_positions_address ON positions(address)")
+
 
 # ── Wallets ────────────────────────────────────────────────────────────────
 
 
 def get_tracked_wallets() -> Dict[str, str]:
     """Return ``{address: display_name}`` for every tracked wallet."""
-    with _get_conn() as conn:
-        c = conn.cursor()
-        c.execute("SELECT address, name FROM wallets")
-        return {row["address"]: row["name"] for row in c.fetchall()}
+    rows = _get_conn().execute("SELECT address, name FROM wallets").fetchall()
+    return {row["address"]: row["name"] for row in rows}
 
 
 def add_wallet(address: str, name: str) -> None:
     """Insert a new wallet or update the display name of an existing one."""
-    with _get_conn() as conn:
-        c = conn.cursor()
-        c.execute(
+    with _transaction() as conn:
+        conn.execute(
             "INSERT OR REPLACE INTO wallets (address, name) VALUES (?, ?)",
             (address, name),
         )
@@ -65,63 +124,153 @@ def add_wallet(address: str, name: str) -> None:
 
 def remove_wallet(address: str) -> None:
     """Delete a wallet **and** all of its stored positions."""
-    with _get_conn() as conn:
-        c = conn.cursor()
-        c.execute("DELETE FROM wallets WHERE address = ?", (address,))
-        c.execute("DELETE FROM positions WHERE address = ?", (address,))
+    with _transaction() as conn:
+        conn.execute("DELETE FROM wallets WHERE address = ?", (address,))
+        conn.execute("DELETE FROM positions WHERE address = ?", (address,))
 
 
 # ── Positions ──────────────────────────────────────────────────────────────
 
 
+def _position_data(row: sqlite3.Row) -> Dict[str, Any]:
+    """Convert a ``positions`` row into the dict shape used by the bot."""
+    return {
+        "size": row["size"],
+        "avgPrice": row["avg_price"],
+        "title": row["title"],
+        "outcome": row["outcome"],
+        "slug": row["slug"],
+        "conditionId": row["condition_id"],
+        "pendingDeletes": row["pending_delete_count"],
+    }
+
+
 def get_wallet_positions(address: str) -> Dict[str, Dict[str, Any]]:
     """Return ``{asset_id: position_data}`` for a single wallet.
 
     Each position dict has the keys ``size``, ``avgPrice``, ``title``,
-    ``outcome``, ``slug``, and ``conditionId``.
+    ``outcome``, ``slug``, ``conditionId``, and ``pendingDeletes`` (how many
+    consecutive polls the position has been missing from the API).
     """
-    with _get_conn() as conn:
-        c = conn.cursor()
-        c.execute("SELECT * FROM positions WHERE address = ?", (address,))
-        positions: Dict[str, Dict[str, Any]] = {}
-        for row in c.fetchall():
-            positions[row["asset_id"]] = {
-                "size": row["size"],
-                "avgPrice": row["avg_price"],
-                "title": row["title"],
-                "outcome": row["outcome"],
-                "slug": row["slug"],
-                "conditionId": row["condition_id"],
-            }
-        return positions
+    rows = _get_conn().execute("SELECT * FROM positions WHERE address = ?", (address,))
+    return {row["asset_id"]: _position_data(row) for row in rows}
+
+
+def get_all_positions() -> Dict[str, Dict[str, Dict[str, Any]]]:
+    """Return ``{address: {asset_id: position_data}}`` for every wallet in one query.
+
+    Position dicts have the same shape as :func:`get_wallet_positions`.
+    """
+    positions: Dict[str, Dict[str, Dict[str, Any]]] = defaultdict(dict)
+    for row in _get_conn().execute("SELECT * FROM positions"):
+        positions[row["address"]][row["asset_id"]] = _position_data(row)
+    return dict(positions)
+
+
+_UPSERT_POSITION_SQL = """INSERT OR REPLACE INTO positions
+    (asset_id, address, size, avg_price, title, outcome, slug, condition_id,
+     pending_delete_count)
+    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)"""
+
+# Same as ``_UPSERT_POSITION_SQL``, but a no-op unless the wallet (bound as a
+# trailing tenth parameter) is still tracked.
+_UPSERT_TRACKED_POSITION_SQL = """INSERT OR REPLACE INTO positions
+    (asset_id, address, size, avg_price, title, outcome, slug, condition_id,
+     pending_delete_count)
+    SELECT ?, ?, ?, ?, ?, ?, ?, ?, ?
+    WHERE EXISTS (SELECT 1 FROM wallets WHERE address = ?)"""
+
+_DELETE_POSITION_SQL = "DELETE FROM positions WHERE address = ? AND asset_id = ?"
+
+
+def _position_row(address: str, asset_id: str, data: Dict[str, Any]) -> Tuple[Any, ...]:
+    """Flatten a position dict into the column order of ``_UPSERT_POSITION_SQL``."""
+    return (
+        asset_id,
+        address,
+        data["size"],
+        data["avgPrice"],
+        data["title"],
+        data["outcome"],
+        data["slug"],
+        data.get("conditionId"),
+        data.get("pendingDeletes", 0),
+    )
 
 
 def upsert_position(address: str, asset_id: str, data: Dict[str, Any]) -> None:
     """Insert a position, or replace it if it already exists."""
-    with _get_conn() as conn:
-        c = conn.cursor()
-        c.execute(
-            """INSERT OR REPLACE INTO positions
-               (asset_id, address, size, avg_price, title, outcome, slug, condition_id)
-               VALUES (?, ?, ?, ?, ?, ?, ?, ?)""",
-            (
-                asset_id,
-                address,
-                data["size"],
-                data["avgPrice"],
-                data["title"],
-                data["outcome"],
-                data["slug"],
-                data.get("conditionId"),
-            ),
-        )
+    with _transaction() as conn:
+        conn.execute(_UPSERT_POSITION_SQL, _position_row(address, asset_id, data))
 
 
 def delete_position(address: str, asset_id: str) -> None:
     """Remove a single position for a given wallet."""
-    with _get_conn() as conn:
-        c = conn.cursor()
-        c.execute(
-            "DELETE FROM positions WHERE address = ? AND asset_id = ?",
-            (address, asset_id),
-        )
+    with _transaction() as conn:
+        conn.execute(_DELETE_POSITION_SQL, (address, asset_id))
+
+
+def save_positions(
+    upserts: Iterable[Tuple[str, str, Dict[str, Any]]],
+    deletes: Iterable[Tuple[str, str]] = (),
+) -> None:
+    """Apply a batch of position changes in a single transaction.
+
+    *upserts* holds ``(address, asset_id, data)`` triples (``data`` shaped as
+    for :func:`upsert_position`); *deletes* holds ``(address, asset_id)`` pairs.
+    Upserts for wallets that are no longer in ``wallets`` are dropped, so a
+    batch collected before a wallet was removed can't bring its rows back.
+    """
+    upsert_rows = [
+        (*_position_row(address, asset_id, data), address) for address, asset_id, data in upserts
+    ]
+    delete_rows = list(deletes)
+    if not upsert_rows and not delete_rows:
+        return
+    with _transaction() as conn:
+        conn.executemany(_UPSERT_TRACKED_POSITION_SQL, upsert_rows)
+        conn.executemany(_DELETE_POSITION_SQL, delete_rows)
+
+
+# ── Categories ─────────────────────────────────────────────────────────────
+
+
+def get_categories(max_age: int) -> Dict[str, Tuple[str, int]]:
+    """Return ``{event_id: (label, fetched_at)}`` for categories fetched within *max_age* seconds.
+
+    ``fetched_at`` is a Unix timestamp, so callers can expire each entry at
+    its original deadline.
+    """
+    cutoff = int(time.time()) - max_age
+    rows = _get_conn().execute(
+        "SELECT event_id, label, fetched_at FROM categories WHERE fetched_at >= ?",
+        (cutoff,),
+    )
+    return {row["event_id"]: (row["label"], row["fetched_at"]) for row in rows}
+
+
+def prune_categories(max_age: int) -> None:
+    """Delete categories fetched more than *max_age* seconds ago."""
+    cutoff = int(time.time()) - max_age
+    with _transaction() as conn:
+        conn.execute("DELETE FROM categories WHERE fetched_at < ?", (cutoff,))
+
+
+_SAVE_CATEGORY_SQL = (
+    "INSERT OR REPLACE INTO categories (event_id, label, fetched_at) VALUES (?, ?, ?)"
+)
+
+
+def save_category(event_id: str, label: str) -> None:
+    """Store (or refresh) the category label for an event."""
+    with _transaction() as conn:
+        conn.execute(_SAVE_CATEGORY_SQL, (event_id, label, int(time.time())))
+
+
+def save_categories(rows: Iterable[Tuple[str, str, int]]) -> None:
+    """Store a batch of ``(event_id, label, fetched_at)`` rows in one transaction."""
+    rows = list(rows)
+    if not rows:
+        return
+    with _transaction() as conn:
+        conn.executemany(_SAVE_CATEGORY_SQL, rows)
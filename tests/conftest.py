@@ -1,9 +1,37 @@
 """Test configuration — provides dummy credentials so the config module loads."""
 
+import gc
 import os
+import tempfile
+
+import pytest
 
 # These are set before any test imports so that
 # ``polytracker.config.Settings.from_env()`` doesn't call ``sys.exit()``
 # when no real .env file is present.
 os.environ.setdefault("TELEGRAM_TOKEN", "test_token_dummy")
 os.environ.setdefault("CHAT_ID", "12345")
+
+
+@pytest.fixture(autouse=True)
+def temp_db():
+    """Replace the production database with a temporary file.
+
+    Every test gets a fresh DB, and the file is cleaned up afterwards.
+    """
+    from polytracker import db
+
+    old_file = db.settings.db_file
+    with tempfile.NamedTemporaryFile(suffix=".db", delete=False) as f:
+        db_path = f.name
+    db.settings.db_file = db_path
+    db.init_db()
+    yield
+    db.close_db()
+    db.settings.db_file = old_file
+    # Force GC to release any lingering SQLite connections on Windows
+    gc.collect()
+    try:
+        os.unlink(db_path)
+    except PermissionError:
+        pass  # Best-effort cleanup; temp file may persist if still locked
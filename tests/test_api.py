@@ -0,0 +1,170 @@
+"""Tests for the category lookups in ``polytracker.api``.
+
+Gamma requests are answered by an ``httpx.MockTransport``; the module's
+caches are replaced per test so their clocks can be controlled.
+"""
+
+import asyncio
+import time
+from types import SimpleNamespace
+
+import httpx
+import pytest
+from cachetools import TLRUCache, TTLCache
+
+from polytracker import api
+
+
+class FakeClock:
+    """A wall clock that only moves when a test advances it."""
+
+    def __init__(self):
+        """Start at the current time."""
+        self.now = time.time()
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock():
+    """Return the clock driving the category caches."""
+    return FakeClock()
+
+
+@pytest.fixture(autouse=True)
+def fresh_caches(monkeypatch, clock):
+    """Give every test empty category caches running on *clock*."""
+    settings = api.settings
+    monkeypatch.setattr(
+        api,
+        "category_cache",
+        TLRUCache(maxsize=settings.category_cache_size, ttu=api._category_expiry, timer=clock),
+    )
+    monkeypatch.setattr(
+        api,
+        "_missing_categories",
+        TTLCache(
+            maxsize=settings.category_cache_size,
+            ttl=settings.category_negative_ttl,
+            timer=clock,
+        ),
+    )
+    monkeypatch.setattr(api, "_inflight_categories", {})
+    monkeypatch.setattr(api, "unsaved_categories", {})
+    monkeypatch.setattr(api, "_request_semaphore", None)
+
+
+@pytest.fixture
+def gamma():
+    """Serve Gamma event lookups from memory.
+
+    Set ``gamma.category`` to the category returned (``""`` for an event
+    without one). While ``gamma.gate`` is cleared, requests block until it
+    is set; ``gamma.started`` is set once the first request arrives.
+    """
+    stub = SimpleNamespace(category="Soccer", requests=0)
+    stub.gate = asyncio.Event()
+    stub.gate.set()
+    stub.started = asyncio.Event()
+
+    async def handler(request):
+        stub.requests += 1
+        stub.started.set()
+        await stub.gate.wait()
+        markets = [{"category": stub.category}] if stub.category else []
+        return httpx.Response(200, json={"markets": markets})
+
+    stub.client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    return stub
+
+
+# ── Request coalescing ─────────────────────────────────────────────────────
+
+
+class TestCoalescing:
+    """Concurrent lookups of the same event share one in-flight request."""
+
+    @pytest.mark.asyncio
+    async def test_concurrent_lookups_send_one_request(self, gamma):
+        gamma.gate.clear()
+        lookups = [
+            asyncio.create_task(api.get_event_category(gamma.client, "evt1")) for _ in range(5)
+        ]
+        await gamma.started.wait()
+        gamma.gate.set()
+        assert await asyncio.wait_for(asyncio.gather(*lookups), 1) == ["⚽ Soccer"] * 5
+        assert gamma.requests == 1
+        assert api._inflight_categories == {}
+        assert api.unsaved_categories["evt1"][0] == "⚽ Soccer"
+
+    @pytest.mark.asyncio
+    async def test_cancelled_owner_releases_waiters(self, gamma):
+        gamma.gate.clear()  # The request never completes.
+        owner = asyncio.create_task(api.get_event_category(gamma.client, "evt1"))
+        await gamma.started.wait()
+        waiters = [
+            asyncio.create_task(api.get_event_category(gamma.client, "evt1")) for _ in range(3)
+        ]
+        await asyncio.sleep(0)  # Let the waiters attach to the shared future.
+
+        owner.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await owner
+        assert await asyncio.wait_for(asyncio.gather(*waiters), 1) == [""] * 3
+        assert gamma.requests == 1
+        assert api._inflight_categories == {}
+
+
+# ── Caching ────────────────────────────────────────────────────────────────
+
+
+class TestCategoryCaches:
+    """Hits and misses are cached separately, each with its own lifetime."""
+
+    @pytest.mark.asyncio
+    async def test_miss_is_negative_cached(self, gamma, clock):
+        gamma.category = ""
+        assert await api.get_event_category(gamma.client, "evt1") == ""
+        assert "evt1" in api._missing_categories
+        assert "evt1" not in api.category_cache
+        assert api.unsaved_categories == {}
+
+        assert await api.get_event_category(gamma.client, "evt1") == ""
+        assert gamma.requests == 1
+
+    @pytest.mark.asyncio
+    async def test_miss_expires_after_negative_ttl(self, gamma, clock):
+        gamma.category = ""
+        await api.get_event_category(gamma.client, "evt1")
+        clock.now += api.settings.category_negative_ttl + 1
+
+        gamma.category = "Soccer"
+        assert await api.get_event_category(gamma.client, "evt1") == "⚽ Soccer"
+        assert gamma.requests == 2
+        assert "evt1" in api.category_cache
+
+    @pytest.mark.asyncio
+    async def test_hit_outlives_negative_ttl(self, gamma, clock):
+        await api.get_event_category(gamma.client, "evt1")
+        clock.now += api.settings.category_negative_ttl + 1
+        assert await api.get_event_category(gamma.client, "evt1") == "⚽ Soccer"
+        assert gamma.requests == 1
+
+    @pytest.mark.asyncio
+    async def test_reloaded_entries_keep_their_original_expiry(self, gamma, clock):
+        ttl = api.settings.category_cache_ttl
+        api.category_cache.update(
+            {
+                "expired": ("⚽ Soccer", clock.now - ttl - 1),
+                "fresh": ("🏀 NBA", clock.now - ttl + 100),
+            }
+        )
+        assert "expired" not in api.category_cache
+        assert await api.get_event_category(gamma.client, "fresh") == "🏀 NBA"
+        assert gamma.requests == 0
+
+        clock.now += 101
+        assert "fresh" not in api.category_cache
+        assert await api.get_event_category(gamma.client, "fresh") == "⚽ Soccer"
+        assert gamma.requests == 1
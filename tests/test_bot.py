@@ -0,0 +1,491 @@
+"""Tests for the wallet-monitoring logic in ``polytracker.bot``.
+
+The Polymarket API and the Telegram bot are replaced with in-memory stubs;
+the database is a temporary SQLite file per test (see ``conftest.temp_db``).
+"""
+
+import asyncio
+import sqlite3
+import time
+from types import SimpleNamespace
+
+import pytest
+
+from polytracker import bot, db
+
+_STATE = (
+    bot._wallets,
+    bot._positions,
+    bot._poll_backoff,
+    bot._positions_digest,
+    bot._unsaved_positions,
+)
+
+
+@pytest.fixture(autouse=True)
+def clean_state(monkeypatch):
+    """Reset the bot's in-memory mirrors and disable poll jitter."""
+    for state in _STATE:
+        state.clear()
+    monkeypatch.setattr(bot.settings, "poll_jitter", 0.0)
+    yield
+    for state in _STATE:
+        state.clear()
+
+
+class FakeBot:
+    """Records every message instead of sending it to Telegram."""
+
+    def __init__(self):
+        """Start with no messages sent."""
+        self.sent = []
+
+    async def send_message(self, **kwargs):
+        self.sent.append(kwargs["text"])
+
+
+@pytest.fixture
+def context():
+    """Return a minimal stand-in for the python-telegram-bot callback context."""
+    return SimpleNamespace(bot=FakeBot(), bot_data={"http": None}, args=[])
+
+
+@pytest.fixture
+def api(monkeypatch):
+    """Stub out every ``api_client`` call made while processing a wallet.
+
+    Set ``api.payload`` to the positions the next fetch returns (or ``None``
+    for a failed fetch) and ``api.digest`` to its payload digest. Fetch
+    counts are kept in ``api.fetches`` and ``api.activity_fetches``.
+    """
+    stub = SimpleNamespace(payload=[], digest=0, fetches=0, activity_fetches=0)
+
+    async def fetch_positions_with_digest(client, address):
+        stub.fetches += 1
+        if stub.payload is None:
+            return None
+        return list(stub.payload), stub.digest
+
+    async def get_event_category(client, event_id):
+        return ""
+
+    async def fetch_recent_activity(client, address):
+        stub.activity_fetches += 1
+        return [], []
+
+    monkeypatch.setattr(bot.api_client, "fetch_positions_with_digest", fetch_positions_with_digest)
+    monkeypatch.setattr(bot.api_client, "get_event_category", get_event_category)
+    monkeypatch.setattr(bot.api_client, "fetch_recent_activity", fetch_recent_activity)
+    return stub
+
+
+def _api_position(asset_id, size):
+    """Build a position as returned by the ``/positions`` endpoint."""
+    return {
+        "asset": asset_id,
+        "size": size,
+        "avgPrice": 0.5,
+        "title": "T",
+        "outcome": "Yes",
+        "slug": "t",
+        "conditionId": f"cond-{asset_id}",
+    }
+
+
+def _stored_position(size, pending_deletes=0):
+    """Build a position in the shape kept by ``bot._positions``."""
+    return {
+        "size": float(size),
+        "avgPrice": 0.5,
+        "title": "T",
+        "outcome": "Yes",
+        "slug": "t",
+        "conditionId": "cond-A",
+        "pendingDeletes": pending_deletes,
+    }
+
+
+def _track(address, positions):
+    """Track *address* with *positions*, in memory and in the database."""
+    db.add_wallet(address, "whale")
+    db.save_positions([(address, asset_id, data) for asset_id, data in positions.items()])
+    bot._wallets[address] = "whale"
+    bot._positions[address] = dict(positions)
+
+
+# ── check_wallets ──────────────────────────────────────────────────────────
+
+
+class TestCheckWallets:
+    """Behaviour of a whole polling tick."""
+
+    @pytest.mark.asyncio
+    async def test_remove_during_tick_is_not_undone(self, monkeypatch, context):
+        _track("0xa", {"A": _stored_position(10)})
+        fetch_started = asyncio.Event()
+        release_fetch = asyncio.Event()
+
+        async def slow_fetch(client, address):
+            fetch_started.set()
+            await release_fetch.wait()
+            return [], 123  # "A" is gone: starts a close debounce.
+
+        monkeypatch.setattr(bot.api_client, "fetch_positions_with_digest", slow_fetch)
+
+        tick = asyncio.create_task(bot.check_wallets(context))
+        await fetch_started.wait()
+
+        async def reply_text(text):
+            pass
+
+        update = SimpleNamespace(
+            effective_user=SimpleNamespace(id=bot.settings.allowed_user_id),
+            message=SimpleNamespace(reply_text=reply_text),
+        )
+        context.args = ["whale"]
+        await bot.remove_wallet(update, context)
+        release_fetch.set()
+        await tick
+
+        assert db.get_tracked_wallets() == {}
+        assert db.get_all_positions() == {}
+        assert bot._positions == {}
+        assert bot._positions_digest == {}
+        assert bot._poll_backoff == {}
+
+    @pytest.mark.asyncio
+    async def test_failed_flush_is_retried_next_tick(self, monkeypatch, context, api):
+        _track("0xa", {})
+        api.payload, api.digest = [_api_position("A", 10)], 7
+        save_positions = db.save_positions
+        failures = []
+
+        def flaky_save(*args):
+            if not failures:
+                failures.append(True)
+                raise sqlite3.OperationalError("database is locked")
+            save_positions(*args)
+
+        monkeypatch.setattr(db, "save_positions", flaky_save)
+        await bot.check_wallets(context)  # Alerts, then the flush fails.
+        assert db.get_all_positions() == {}
+        await bot.check_wallets(context)  # Unchanged payload; retries the flush.
+        assert set(db.get_all_positions()["0xa"]) == {"A"}
+        assert bot._unsaved_positions == {}
+
+        # After a restart the reloaded mirror matches, so nothing re-alerts.
+        bot._positions.clear()
+        bot._positions_digest.clear()
+        bot._positions.update(db.get_all_positions())
+        await bot.check_wallets(context)
+        assert len(context.bot.sent) == 1
+
+    @pytest.mark.asyncio
+    async def test_new_categories_are_saved_with_the_tick(self, monkeypatch, context, api):
+        monkeypatch.setattr(bot.api_client, "unsaved_categories", {"evt1": ("⚽ Soccer", 100)})
+        save_categories = db.save_categories
+        failures = []
+
+        def flaky_save(rows):
+            if not failures:
+                failures.append(True)
+                raise sqlite3.OperationalError("database is locked")
+            save_categories(rows)
+
+        monkeypatch.setattr(db, "save_categories", flaky_save)
+        await bot.check_wallets(context)
+        assert bot.api_client.unsaved_categories == {"evt1": ("⚽ Soccer", 100)}
+
+        await bot.check_wallets(context)
+        assert bot.api_client.unsaved_categories == {}
+        assert db.get_categories(max_age=10**10) == {"evt1": ("⚽ Soccer", 100)}
+
+    @pytest.mark.asyncio
+    async def test_backed_off_wallet_is_skipped_until_due(self, context, api):
+        _track("0xa", {})
+        bot._poll_backoff["0xa"] = (30.0, time.monotonic() + 30)
+        await bot.check_wallets(context)
+        assert api.fetches == 0
+
+        bot._poll_backoff["0xa"] = (30.0, time.monotonic() - 1)
+        await bot.check_wallets(context)
+        assert api.fetches == 1
+
+    @pytest.mark.asyncio
+    async def test_failed_fetch_backs_off(self, context, api):
+        _track("0xa", {})
+        api.payload = None
+        await bot.check_wallets(context)
+        interval, _ = bot._poll_backoff["0xa"]
+        assert interval == bot.settings.check_interval * bot.settings.poll_backoff_factor
+
+
+# ── _record_poll ───────────────────────────────────────────────────────────
+
+
+class TestRecordPoll:
+    """The per-wallet failure/idle backoff state machine."""
+
+    def test_failure_stretches_interval(self):
+        bot._record_poll("0xa", None, now=100.0)
+        assert bot._poll_backoff["0xa"] == (4.5, 104.5)
+        bot._record_poll("0xa", None, now=200.0)
+        assert bot._poll_backoff["0xa"] == (6.75, 206.75)
+
+    def test_failures_are_capped(self):
+        for _ in range(50):
+            bot._record_poll("0xa", None, now=0.0)
+        assert bot._poll_backoff["0xa"][0] == bot.settings.max_poll_interval
+
+    def test_change_resets_backoff(self):
+        bot._record_poll("0xa", None, now=0.0)
+        bot._record_poll("0xa", True, now=1.0)
+        assert "0xa" not in bot._poll_backoff
+
+    def test_idle_wallets_stay_at_full_rate_by_default(self):
+        for _ in range(10):
+            bot._record_poll("0xa", False, now=0.0)
+        assert "0xa" not in bot._poll_backoff
+
+    def test_idle_ceiling_follows_check_interval(self, monkeypatch):
+        monkeypatch.setattr(bot.settings, "check_interval", 10)
+        bot._record_poll("0xa", False, now=0.0)
+        assert "0xa" not in bot._poll_backoff
+
+        bot._poll_backoff["0xa"] = (30.0, 0.0)
+        bot._record_poll("0xa", False, now=0.0)
+        assert bot._poll_backoff["0xa"][0] == 15.0
+        bot._record_poll("0xa", False, now=0.0)
+        assert "0xa" not in bot._poll_backoff
+
+    def test_idle_stretch_is_capped(self, monkeypatch):
+        monkeypatch.setattr(bot.settings, "max_idle_poll_interval", 15)
+        bot._record_poll("0xa", False, now=0.0)
+        assert bot._poll_backoff["0xa"][0] == 4.5
+        for _ in range(10):
+            bot._record_poll("0xa", False, now=0.0)
+        assert bot._poll_backoff["0xa"][0] == 15
+
+    def test_idle_poll_after_failures_halves_toward_idle_cap(self, monkeypatch):
+        monkeypatch.setattr(bot.settings, "max_idle_poll_interval", 15)
+        bot._poll_backoff["0xa"] = (60.0, 0.0)
+        bot._record_poll("0xa", False, now=0.0)
+        assert bot._poll_backoff["0xa"][0] == 30.0
+        bot._record_poll("0xa", False, now=0.0)
+        bot._record_poll("0xa", False, now=0.0)
+        assert bot._poll_backoff["0xa"][0] == 15
+
+    def test_idle_poll_after_failures_recovers_without_idle_stretch(self):
+        bot._poll_backoff["0xa"] = (60.0, 0.0)
+        for _ in range(10):
+            bot._record_poll("0xa", False, now=0.0)
+        assert "0xa" not in bot._poll_backoff
+
+
+# ── _process_wallet ────────────────────────────────────────────────────────
+
+
+async def _process(context, positions):
+    """Run one ``_process_wallet`` pass for ``0xa`` over *positions*."""
+    upserts, deletes = [], []
+    changed = await bot._process_wallet(None, context, "0xa", "whale", positions, upserts, deletes)
+    return changed, upserts, deletes
+
+
+class TestCloseDebounce:
+    """A missing position is only reported closed after several polls."""
+
+    @pytest.mark.asyncio
+    async def test_absence_is_counted(self, context, api):
+        positions = {"A": _stored_position(10)}
+        changed, upserts, deletes = await _process(context, positions)
+        assert changed is True
+        assert positions["A"]["pendingDeletes"] == 1
+        assert upserts == [("0xa", "A", positions["A"])]
+        assert deletes == []
+        assert context.bot.sent == []
+
+    @pytest.mark.asyncio
+    async def test_reappearing_position_resets_count(self, context, api):
+        positions = {"A": _stored_position(10, pending_deletes=2)}
+        api.payload = [_api_position("A", 10)]
+        changed, upserts, _ = await _process(context, positions)
+        assert changed is True
+        assert positions["A"]["pendingDeletes"] == 0
+        assert upserts == [("0xa", "A", positions["A"])]
+        assert context.bot.sent == []
+
+    @pytest.mark.asyncio
+    async def test_close_is_reported_at_threshold(self, context, api):
+        count = bot.settings.close_debounce_count
+        positions = {"A": _stored_position(10, pending_deletes=count - 1)}
+        changed, upserts, deletes = await _process(context, positions)
+        assert changed is True
+        assert positions == {}
+        assert upserts == []
+        assert deletes == [("0xa", "A")]
+        assert len(context.bot.sent) == 1
+        assert context.bot.sent[0].startswith("🚪 **POSITION CLOSED")
+
+    @pytest.mark.asyncio
+    async def test_persisted_count_survives_restart(self, context, api):
+        count = bot.settings.close_debounce_count
+        _track("0xa", {"A": _stored_position(10)})
+        for _ in range(count - 1):
+            await bot.check_wallets(context)
+        assert db.get_all_positions()["0xa"]["A"]["pendingDeletes"] == count - 1
+
+        # Simulate a restart: reload the mirror from SQLite.
+        bot._positions.clear()
+        bot._positions_digest.clear()
+        bot._positions.update(db.get_all_positions())
+        await bot.check_wallets(context)
+        assert db.get_all_positions() == {}
+        assert len(context.bot.sent) == 1
+
+
+class TestPayloadDigest:
+    """Skipping the diff when the ``/positions`` payload hasn't changed."""
+
+    @pytest.mark.asyncio
+    async def test_unchanged_payload_skips_diff(self, context, api):
+        positions = {"A": _stored_position(10)}
+        api.payload, api.digest = [_api_position("A", 10)], 7
+        assert (await _process(context, positions))[0] is False
+        assert bot._positions_digest["0xa"] == 7
+
+        # Same digest: the (different) payload isn't even looked at.
+        api.payload = [_api_position("A", 50)]
+        changed, upserts, _ = await _process(context, positions)
+        assert changed is False
+        assert upserts == []
+        assert context.bot.sent == []
+
+    @pytest.mark.asyncio
+    async def test_changed_digest_runs_diff(self, context, api):
+        positions = {"A": _stored_position(10)}
+        bot._positions_digest["0xa"] = 7
+        api.payload, api.digest = [_api_position("A", 50)], 8
+        changed, _, _ = await _process(context, positions)
+        assert changed is True
+        assert context.bot.sent[0].startswith("📈 **INCREASED")
+        assert bot._positions_digest["0xa"] == 8
+
+    @pytest.mark.asyncio
+    async def test_pending_close_is_still_counted(self, context, api):
+        positions = {"A": _stored_position(10, pending_deletes=1)}
+        bot._positions_digest["0xa"] = 7
+        api.payload, api.digest = [], 7
+        changed, upserts, _ = await _process(context, positions)
+        assert changed is True
+        assert positions["A"]["pendingDeletes"] == 2
+        assert upserts == [("0xa", "A", positions["A"])]
+
+    @pytest.mark.asyncio
+    async def test_digest_not_recorded_when_alert_fails(self, context, api):
+        async def failing_send(**kwargs):
+            raise RuntimeError("telegram down")
+
+        context.bot.send_message = failing_send
+        api.payload, api.digest = [_api_position("A", 10)], 7
+        with pytest.raises(RuntimeError):
+            await _process(context, {})
+        assert "0xa" not in bot._positions_digest
+
+
+class TestRecentActivity:
+    """Trades and activity are fetched at most once per wallet per poll."""
+
+    @pytest.mark.asyncio
+    async def test_fetched_once_for_sells_and_closes(self, context, api):
+        count = bot.settings.close_debounce_count
+        positions = {
+            "A": _stored_position(100),
+            "B": _stored_position(10, pending_deletes=count - 1),
+        }
+        api.payload = [_api_position("A", 50)]  # A decreased, B closed.
+        await _process(context, positions)
+        assert api.activity_fetches == 1
+        assert len(context.bot.sent) == 2
+
+    @pytest.mark.asyncio
+    async def test_not_fetched_for_new_or_increased(self, context, api):
+        positions = {"A": _stored_position(10)}
+        api.payload = [_api_position("A", 50), _api_position("B", 10)]
+        await _process(context, positions)
+        assert api.activity_fetches == 0
+        assert len(context.bot.sent) == 2
+
+
+# ── /add ───────────────────────────────────────────────────────────────────
+
+
+@pytest.fixture
+def add_command(context):
+    """Prepare an ``/add 0xnew Big Whale`` update and collect the bot's replies."""
+    replies = []
+
+    async def edit_text(text):
+        replies.append(text)
+
+    async def reply_text(text):
+        replies.append(text)
+        return SimpleNamespace(edit_text=edit_text)
+
+    context.args = ["0xnew", "Big", "Whale"]
+    update = SimpleNamespace(
+        effective_user=SimpleNamespace(id=bot.settings.allowed_user_id),
+        message=SimpleNamespace(reply_text=reply_text),
+    )
+    return SimpleNamespace(update=update, replies=replies)
+
+
+class TestAddWallet:
+    """The ``/add`` sync."""
+
+    @pytest.mark.asyncio
+    async def test_sync_is_saved_in_one_batch(self, monkeypatch, context, add_command):
+        async def fetch_positions(client, address):
+            return [_api_position("A", 10), _api_position("B", 20)]
+
+        monkeypatch.setattr(bot.api_client, "fetch_positions", fetch_positions)
+
+        saves = []
+        save_positions = db.save_positions
+
+        def counting_save(upserts, deletes=()):
+            saves.append(len(upserts))
+            save_positions(upserts, deletes)
+
+        monkeypatch.setattr(db, "save_positions", counting_save)
+
+        # Record what the mirror held at the moment the wallet became visible.
+        mirror_when_visible = {}
+
+        class Wallets(dict):
+            def __setitem__(self, address, name):
+                mirror_when_visible[address] = set(bot._positions.get(address, {}))
+                super().__setitem__(address, name)
+
+        monkeypatch.setattr(bot, "_wallets", Wallets())
+
+        await bot.add_wallet(add_command.update, context)
+
+        assert mirror_when_visible == {"0xnew": {"A", "B"}}
+        assert saves == [2]
+        assert db.get_tracked_wallets() == {"0xnew": "Big Whale"}
+        assert set(db.get_all_positions()["0xnew"]) == {"A", "B"}
+        assert add_command.replies[-1] == "✅ Added **Big Whale** (2 bets synced)."
+
+    @pytest.mark.asyncio
+    async def test_failed_fetch_adds_nothing(self, monkeypatch, context, add_command):
+        async def fetch_positions(client, address):
+            return None
+
+        monkeypatch.setattr(bot.api_client, "fetch_positions", fetch_positions)
+        await bot.add_wallet(add_command.update, context)
+
+        assert add_command.replies[-1].startswith("❌ Couldn't sync **Big Whale**")
+        assert bot._wallets == {}
+        assert bot._positions == {}
+        assert db.get_tracked_wallets() == {}
@@ -1,39 +1,15 @@
 """Tests for the database layer.
 
-Uses a temporary SQLite file per test so no real data is affected.
+Uses a temporary SQLite file per test (see ``conftest.temp_db``) so no real
+data is affected.
 """
 
-import os
-import tempfile
+import time
 
 import pytest
 
 from polytracker import db
 
-
-@pytest.fixture(autouse=True)
-def temp_db():
-    """Replace the production database with a temporary file.
-
-    Every test gets a fresh DB, and the file is cleaned up afterwards.
-    """
-    import gc
-
-    old_file = db.settings.db_file
-    with tempfile.NamedTemporaryFile(suffix=".db", delete=False) as f:
-        db_path = f.name
-    db.settings.db_file = db_path
-    db.init_db()
-    yield
-    db.settings.db_file = old_file
-    # Force GC to release any lingering SQLite connections on Windows
-    gc.collect()
-    try:
-        os.unlink(db_path)
-    except PermissionError:
-        pass  # Best-effort cleanup; temp file may persist if still locked
-
-
 # ── Wallet tests ───────────────────────────────────────────────────────────
 
 
@@ -78,6 +54,9 @@ class TestWallets:
 
 # ── Position tests ─────────────────────────────────────────────────────────
 
+# Every position field except ``size``, for tests that only vary the size.
+BASE_POSITION = {"avgPrice": 0.5, "title": "T", "outcome": "Y", "slug": "t", "conditionId": "c1"}
+
 
 class TestPositions:
     """CRUD operations on the ``positions`` table."""
@@ -146,3 +125,130 @@ class TestPositions:
 
     def test_get_empty_for_unknown_wallet(self):
         assert db.get_wallet_positions("0xnonexistent") == {}
+
+    def test_save_positions_batch(self):
+        db.add_wallet("0xabc", "test")
+        db.upsert_position("0xabc", "stale", {**BASE_POSITION, "size": 10})
+        db.save_positions(
+            [
+                ("0xabc", "asset1", {**BASE_POSITION, "size": 100}),
+                ("0xabc", "asset2", {**BASE_POSITION, "size": 200}),
+            ],
+            [("0xabc", "stale")],
+        )
+        positions = db.get_wallet_positions("0xabc")
+        assert set(positions) == {"asset1", "asset2"}
+        assert positions["asset2"]["size"] == 200.0
+
+    def test_save_positions_skips_untracked_wallets(self):
+        db.add_wallet("0xabc", "test")
+        db.save_positions(
+            [
+                ("0xabc", "asset1", {**BASE_POSITION, "size": 1}),
+                ("0xgone", "asset1", {**BASE_POSITION, "size": 1}),
+            ]
+        )
+        assert set(db.get_all_positions()) == {"0xabc"}
+
+    def test_get_all_positions_groups_by_wallet(self):
+        db.upsert_position("0xabc", "asset1", {**BASE_POSITION, "size": 1})
+        db.upsert_position("0xabc", "asset2", {**BASE_POSITION, "size": 2})
+        db.upsert_position("0xdef", "asset1", {**BASE_POSITION, "size": 3})
+        positions = db.get_all_positions()
+        assert set(positions) == {"0xabc", "0xdef"}
+        assert set(positions["0xabc"]) == {"asset1", "asset2"}
+        assert positions["0xdef"]["asset1"]["size"] == 3
+        assert positions["0xabc"] == db.get_wallet_positions("0xabc")
+
+    def test_get_all_positions_empty(self):
+        assert db.get_all_positions() == {}
+
+    def test_pending_deletes_defaults_to_zero(self):
+        db.upsert_position("0xabc", "asset1", {**BASE_POSITION, "size": 1})
+        assert db.get_wallet_positions("0xabc")["asset1"]["pendingDeletes"] == 0
+
+    def test_pending_deletes_round_trip(self):
+        db.add_wallet("0xabc", "test")
+        db.save_positions([("0xabc", "asset1", {**BASE_POSITION, "size": 1, "pendingDeletes": 2})])
+        assert db.get_all_positions()["0xabc"]["asset1"]["pendingDeletes"] == 2
+
+
+# ── Category tests ─────────────────────────────────────────────────────────
+
+
+class TestCategories:
+    """Persistence of the event-category cache."""
+
+    def test_save_and_get(self):
+        before = int(time.time())
+        db.save_category("evt1", "⚽ Soccer")
+        label, fetched_at = db.get_categories(max_age=60)["evt1"]
+        assert label == "⚽ Soccer"
+        assert before <= fetched_at <= time.time()
+
+    def test_save_replaces_existing(self):
+        db.save_category("evt1", "Old")
+        db.save_category("evt1", "New")
+        categories = db.get_categories(max_age=60)
+        assert set(categories) == {"evt1"}
+        assert categories["evt1"][0] == "New"
+
+    def test_expired_entries_are_skipped(self):
+        with db._transaction() as conn:
+            conn.execute(
+                "INSERT INTO categories (event_id, label, fetched_at) VALUES (?, ?, ?)",
+                ("evt_old", "Stale", 0),
+            )
+        db.save_category("evt_new", "Fresh")
+        assert set(db.get_categories(max_age=60)) == {"evt_new"}
+
+    def test_save_categories_batch(self):
+        db.save_category("evt1", "Old")
+        db.save_categories([("evt1", "New", 100), ("evt2", "Other", 200)])
+        rows = db._get_conn().execute("SELECT * FROM categories ORDER BY event_id").fetchall()
+        assert [tuple(row) for row in rows] == [("evt1", "New", 100), ("evt2", "Other", 200)]
+
+    def test_prune_deletes_expired_rows(self):
+        with db._transaction() as conn:
+            conn.execute(
+                "INSERT INTO categories (event_id, label, fetched_at) VALUES (?, ?, ?)",
+                ("evt_old", "Stale", 0),
+            )
+        db.save_category("evt_new", "Fresh")
+        db.prune_categories(max_age=60)
+        rows = db._get_conn().execute("SELECT event_id FROM categories").fetchall()
+        assert [row["event_id"] for row in rows] == ["evt_new"]
+
+
+# ── Connection tests ───────────────────────────────────────────────────────
+
+
+class TestConnection:
+    """Behaviour of the shared, long-lived connection."""
+
+    def test_connection_is_reused(self):
+        assert db._get_conn() is db._get_conn()
+
+    def test_wal_mode_enabled(self):
+        mode = db._get_conn().execute("PRAGMA journal_mode").fetchone()[0]
+        assert mode == "wal"
+
+    def test_page_cache_size(self):
+        assert db._get_conn().execute("PRAGMA cache_size").fetchone()[0] == -64000
+
+    def test_address_lookup_uses_index(self):
+        plan = db._get_conn().execute(
+            "EXPLAIN QUERY PLAN SELECT * FROM positions WHERE address = ?", ("0xabc",)
+        )
+        details = " ".join(row["detail"] for row in plan)
+        assert "USING INDEX idx_positions_address" in details
+
+    def test_failed_transaction_rolls_back(self):
+        with pytest.raises(RuntimeError):
+            with db._transaction() as conn:
+                conn.execute(
+                    "INSERT INTO wallets (address, name) VALUES (?, ?)",
+                    ("0xabc", "test"),
+                )
+                raise RuntimeError("boom")
+        assert db.get_tracked_wallets() == {}